@@ -12,13 +12,17 @@ import pendulum
 from airflow.decorators import task
 from airflow.models.dag import DAG
 from airflow.operators.bash import BashOperator
+from airflow.stats import Stats
 
 from include.get_astronauts import AstronautsStrategy
 from include.get_in_space import InSpaceStrategy
 from include.get_iss_location import IssLocationStrategy
 from include.get_nasa_apod import NasaApodStrategy
+from include.utils import backpressure, spool
 from include.utils.api_strategy import ApiStrategy
-from include.utils.snowflake_loader import load_to_snowflake
+from include.utils.profiling import profile_run
+from include.utils.snowflake_compaction import compact_table
+from include.utils.snowflake_loader import load_segments_to_snowflake
 
 # Snowflake configuration
 SNOWFLAKE_CONN_ID = "snowflake_default"
@@ -38,7 +42,21 @@ API_SOURCES = [
         "raw_table_name": "CB_ISS_LOCATION",
         "overwrite_table": False, 
         "timestamp_cols": [{'name': 'API_TIMESTAMP', 'unit': 's'}],
-        "dbt_models": ["mc_iss_location"],
+        "dbt_models": ["mc_iss_location", "mc_iss_current"],
+        "dbt_retries": 0,
+        "profile": False,
+        "spool": {"flush_min_records": 3, "flush_max_lag_seconds": 180},
+        "backpressure": {"max_staleness_seconds": 90, "max_coalesce_seconds": 600, "latency_smoothing": 0.3},
+        "compaction": {
+            "schedule": "@daily",
+            "rollup_table_name": "CB_ISS_LOCATION_ROLLUP",
+            "rollup_cols": ["LATITUDE", "LONGITUDE", "API_TIMESTAMP"],
+            "hot_window_hours": 24,
+            "rollup_minutes": 10,
+            "rollup_retention_days": None,
+            "archive_stage": "CB_ARCHIVE_STAGE",
+            "dbt_models": ["mc_iss_location_history"],
+        },
     },
     {
         "name": "nasa_apod",
@@ -47,7 +65,8 @@ API_SOURCES = [
         "raw_table_name": "CB_NASA_APOD",
         "overwrite_table": True,  
         "timestamp_cols": [{'name': 'APOD_DATE'}],
-        "dbt_models": ["mc_apod"],
+        "dbt_models": ["mc_apod", "mc_apod_current"],
+        "profile": False,
     },
     {
         "name": "astronauts",
@@ -56,7 +75,8 @@ API_SOURCES = [
         "raw_table_name": "CB_ASTRONAUTS",
         "overwrite_table": True, 
         "timestamp_cols": [],
-        "dbt_models": [],
+        "dbt_models": ["mc_astronauts"],
+        "profile": False,
     },
     {
         "name": "in_space",
@@ -66,9 +86,42 @@ API_SOURCES = [
         "overwrite_table": True, 
         "timestamp_cols": [],
         "dbt_models": ["mc_astronauts"],
+        "profile": False,
     },
 ]
 
+def create_dbt_run_task(dbt_models: list[str], retries: int = 2) -> BashOperator:
+    """
+    Create a task that runs the given dbt models and their upstream models.
+
+    Args:
+        dbt_models: List of dbt models to run
+        retries: Number of retries for the dbt run
+
+    Returns:
+        Configured BashOperator
+    """
+    models_to_run = " ".join([f"+{model}" for model in dbt_models])
+    
+    dbt_vars = {
+        "raw_db": SNOWFLAKE_DATABASE,
+        "raw_schema": SNOWFLAKE_SCHEMA
+    }
+
+    bash_command = (
+        f"cd {DBT_PROJECT_PATH} && "
+        f"{DBT_EXECUTABLE_PATH} run "
+        f"--select {models_to_run} "
+        f"--profiles-dir {DBT_PROFILE_PATH} "
+        f"--vars '{json.dumps(dbt_vars)}'"
+    )
+
+    return BashOperator(
+        task_id="dbt_run_models",
+        bash_command=bash_command,
+        retries=retries,
+    )
+
 def create_dag(
     dag_id: str,
     schedule: str,
@@ -77,7 +130,11 @@ def create_dag(
     raw_table_name: str,
     overwrite: bool,
     timestamp_cols: list[dict] = None,
-    dbt_models: list[str] = None
+    dbt_models: list[str] = None,
+    dbt_retries: int = 2,
+    profile: bool = False,
+    spool_policy: dict = None,
+    backpressure_policy: dict = None,
 ) -> DAG:
     """
     Create a DAG for fetching API data and loading to Snowflake.
@@ -91,6 +148,18 @@ def create_dag(
         overwrite: Whether to overwrite existing data
         timestamp_cols: Columns to parse as timestamps
         dbt_models: List of dbt models to run after loading
+        dbt_retries: Number of retries for the dbt run. Retries hold the DAG's
+                     only active run, so high-frequency sources set this to 0
+                     and let the next run rebuild the models.
+        profile: Whether to sample-profile the fetch and load tasks
+        spool_policy: When to group-commit spooled records, e.g.
+                      {'flush_min_records': 3, 'flush_max_lag_seconds': 180}.
+                      Defaults to flushing on every run.
+        backpressure_policy: If set, runs that are stale, or that start within
+                             the overrun of the smoothed end-to-end latency
+                             beyond the schedule period after the previous
+                             full run finished, are skipped,
+                             e.g. {'max_staleness_seconds': 90}
     
     Returns:
         Configured Airflow DAG instance
@@ -107,66 +176,176 @@ def create_dag(
     if dbt_models:
         tags.append('dbt_transform')
 
-    # Define tags to categorize the DAG's functionality
     with DAG(
         dag_id=dag_id,
         start_date=pendulum.datetime(2023, 1, 1, tz="UTC"),
         schedule=schedule,
         catchup=False,
+        # With catchup disabled the scheduler creates the next run only once
+        # the current one finishes, so runs never pile up.
+        max_active_runs=1,
         doc_md=doc_md,
         default_args=default_args,
         tags=tags,
     ) as dag:
 
         @task
-        def fetch_data_task() -> list[dict]:
+        def fetch_data_task(run_id: str = None, ti=None) -> list[dict]:
             """Generic task to fetch data using the provided API client."""
             logging.info(f"DAG: {dag_id} - Running fetch_data_task using API client: {api_client.__class__.__name__}")
-            data = api_client.fetch_data()
+            with profile_run(profile, dag_id, run_id, "fetch_data_task", f"try_{ti.try_number}"):
+                data = api_client.fetch_data()
             logging.info(f"DAG: {dag_id} - Fetched {len(data)} records.")
             return data
 
         @task
-        def load_data_task(data: list[dict]):
-            """Generic task to load data into a specified Snowflake table."""
+        def load_data_task(data: list[dict], run_id: str = None, ti=None) -> str | None:
+            """Durably spool fetched data for the target table and acknowledge."""
+            if not data:
+                logging.info(f"DAG: {dag_id} - No data to spool for {raw_table_name}.")
+                return None
             logging.info(f"DAG: {dag_id} - Running load_data_task for table: {raw_table_name}")
-            load_to_snowflake(
-                data=data,
+            with profile_run(profile, dag_id, run_id, "load_data_task", f"try_{ti.try_number}"):
+                segment_id = spool.append(raw_table_name, data)
+            logging.info(f"DAG: {dag_id} - Spooled {len(data)} records for {raw_table_name} in segment {segment_id}.")
+            return segment_id
+
+        # No retries: a retry would hold the DAG's only active run slot while the
+        # next run flushes every pending segment anyway.
+        @task.short_circuit(ignore_downstream_trigger_rules=False, retries=0)
+        def flush_spool_task(run_id: str = None, ti=None) -> bool:
+            """Group-commit all pending spool segments into Snowflake; skip downstream if nothing was loaded."""
+            policy = spool_policy or {}
+
+            def load(segments):
+                return load_segments_to_snowflake(
+                    segments=segments,
+                    table_name=raw_table_name,
+                    snowflake_conn_id=SNOWFLAKE_CONN_ID,
+                    database=SNOWFLAKE_DATABASE,
+                    schema=SNOWFLAKE_SCHEMA,
+                    overwrite=overwrite,
+                    timestamp_cols=timestamp_cols,
+                )
+
+            try:
+                with profile_run(profile, dag_id, run_id, "flush_spool_task", f"try_{ti.try_number}"):
+                    loaded = spool.flush(
+                        raw_table_name,
+                        load,
+                        min_records=policy.get('flush_min_records', 1),
+                        max_lag_seconds=policy.get('flush_max_lag_seconds', 0),
+                    )
+            finally:
+                spool_stats = spool.stats(raw_table_name)
+                Stats.gauge(f"space_cadet.spool.{raw_table_name}.segments", spool_stats.segments)
+                Stats.gauge(f"space_cadet.spool.{raw_table_name}.records", spool_stats.records)
+                Stats.gauge(f"space_cadet.spool.{raw_table_name}.lag_seconds", spool_stats.lag_seconds)
+                logging.info(
+                    f"DAG: {dag_id} - Spool for {raw_table_name}: {spool_stats.segments} segments, "
+                    f"{spool_stats.records} records pending, lag {spool_stats.lag_seconds:.0f}s."
+                )
+            return loaded > 0
+
+        fetch_task = fetch_data_task()
+        flush_task = load_data_task(fetch_task) >> flush_spool_task()
+        last_task = flush_task
+
+        if dbt_models:
+            dbt_run_task = create_dbt_run_task(dbt_models, retries=dbt_retries)
+            flush_task >> dbt_run_task
+            last_task = dbt_run_task
+
+        if backpressure_policy:
+
+            @task.short_circuit
+            def check_backpressure_task(data_interval_start=None, data_interval_end=None, dag_run=None) -> bool:
+                """Skip this run if it is stale or the pipeline is still catching up."""
+                return backpressure.should_run(
+                    dag_id,
+                    data_interval_start,
+                    data_interval_end,
+                    is_manual=dag_run.run_type == "manual",
+                    max_staleness_seconds=backpressure_policy.get('max_staleness_seconds', 120),
+                    max_coalesce_seconds=backpressure_policy.get('max_coalesce_seconds', 600),
+                )
+
+            @task(trigger_rule="none_failed")
+            def record_latency_task(dag_run=None):
+                """Fold this run's end-to-end latency into the adaptive poll interval."""
+                backpressure.record_latency(
+                    dag_id,
+                    dag_run.start_date,
+                    smoothing=backpressure_policy.get('latency_smoothing', 0.3),
+                )
+
+            check_backpressure_task() >> fetch_task
+            last_task >> record_latency_task()
+    
+    return dag
+
+def create_compaction_dag(
+    dag_id: str,
+    raw_table_name: str,
+    compaction: dict,
+) -> DAG:
+    """
+    Create a DAG that keeps an append-only raw table bounded in size.
+
+    Args:
+        dag_id: Unique DAG identifier
+        raw_table_name: Append-only Snowflake table to compact
+        compaction: Compaction settings from the source's API_SOURCES entry
+
+    Returns:
+        Configured Airflow DAG instance
+    """
+
+    default_args = {
+        'owner': 'airflow',
+        'retries': 1,
+        'retry_delay': pendulum.duration(minutes=5),
+    }
+
+    with DAG(
+        dag_id=dag_id,
+        start_date=pendulum.datetime(2023, 1, 1, tz="UTC"),
+        schedule=compaction.get('schedule', '@daily'),
+        catchup=False,
+        max_active_runs=1,
+        doc_md=f"""
+        ### Compaction DAG for `{raw_table_name}`\n
+        Rolls rows older than {compaction.get('hot_window_hours', 24)} hours into
+        `{compaction['rollup_table_name']}`, archives them to
+        `@{compaction.get('archive_stage') or 'n/a'}` and prunes them from the raw table,
+        then runs `{', '.join(compaction.get('dbt_models') or []) or 'no dbt models'}`.
+        """,
+        default_args=default_args,
+        tags=['maintenance', 'snowflake'],
+    ) as dag:
+
+        @task
+        def compact_data_task():
+            """Roll up, archive and prune rows outside the hot window."""
+            logging.info(f"DAG: {dag_id} - Running compact_data_task for table: {raw_table_name}")
+            compact_table(
                 table_name=raw_table_name,
+                rollup_table_name=compaction['rollup_table_name'],
+                rollup_cols=compaction['rollup_cols'],
                 snowflake_conn_id=SNOWFLAKE_CONN_ID,
                 database=SNOWFLAKE_DATABASE,
                 schema=SNOWFLAKE_SCHEMA,
-                overwrite=overwrite,
-                timestamp_cols=timestamp_cols,
+                hot_window_hours=compaction.get('hot_window_hours', 24),
+                rollup_minutes=compaction.get('rollup_minutes', 10),
+                rollup_retention_days=compaction.get('rollup_retention_days'),
+                archive_stage=compaction.get('archive_stage'),
             )
-            logging.info(f"DAG: {dag_id} - Successfully loaded data into {raw_table_name}.")
+            logging.info(f"DAG: {dag_id} - Successfully compacted {raw_table_name}.")
 
-        load_task = load_data_task(fetch_data_task())
+        compact_task = compact_data_task()
+        if compaction.get('dbt_models'):
+            compact_task >> create_dbt_run_task(compaction['dbt_models'])
 
-        if dbt_models:
-            models_to_run = " ".join([f"+{model}" for model in dbt_models])
-            
-            dbt_vars = {
-                "raw_db": SNOWFLAKE_DATABASE,
-                "raw_schema": SNOWFLAKE_SCHEMA
-            }
-
-            bash_command = (
-                f"cd {DBT_PROJECT_PATH} && "
-                f"{DBT_EXECUTABLE_PATH} run "
-                f"--select {models_to_run} "
-                f"--profiles-dir {DBT_PROFILE_PATH} "
-                f"--vars '{json.dumps(dbt_vars)}'"
-            )
-
-            dbt_run_task = BashOperator(
-                task_id="dbt_run_models",
-                bash_command=bash_command,
-                retries=2,
-            )
-
-            load_task >> dbt_run_task
-    
     return dag
 
 for source in API_SOURCES:
@@ -176,6 +355,10 @@ for source in API_SOURCES:
     overwrite = source.get('overwrite_table', True)
     timestamp_cols = source.get('timestamp_cols')
     dbt_models = source.get('dbt_models')
+    dbt_retries = source.get('dbt_retries', 2)
+    profile = source.get('profile', False)
+    spool_policy = source.get('spool')
+    backpressure_policy = source.get('backpressure')
     doc_md = f"""
     ### Dynamically Generated DAG: {source['name'].replace('_', ' ').title()}\n
     **Purpose:** This DAG fetches data from an external API and loads it into a raw Snowflake table.`.
@@ -188,13 +371,17 @@ for source in API_SOURCES:
     - **Schedule:** `{source['schedule']}`
     - **Write Disposition:** `{'Overwrite' if overwrite else 'Append'}`
     - **Target Snowflake Table:** `{SNOWFLAKE_DATABASE}.{SNOWFLAKE_SCHEMA}.{raw_table_name}`
+    - **Profiling:** `{'On' if profile else 'Off'}`
+    - **Backpressure:** `{'Skips stale runs and runs that would overrun the schedule' if backpressure_policy else 'Off'}`
     
     ---
 
     #### Tasks:
     1.  **`fetch_data_task`**: Uses the `{api_client_name}` class to pull data from the source API.
-    2.  **`load_data_task`**: Loads the fetched data into `{raw_table_name}`.
-    3.  **`dbt_run_models`**: This task will run the associated models using a `BashOperator`.
+    2.  **`load_data_task`**: Durably spools the fetched data on the worker for `{raw_table_name}`.
+        The spool is local to the worker (`SPOOL_DIR`), so this assumes a single worker host.
+    3.  **`flush_spool_task`**: Group-commits all pending spool segments into `{raw_table_name}`.
+    4.  **`dbt_run_models`**: This task will run the associated models using a `BashOperator`.
     """
 
     globals()[dag_id] = create_dag(
@@ -206,8 +393,20 @@ for source in API_SOURCES:
         overwrite=overwrite,
         timestamp_cols=timestamp_cols,
         dbt_models=dbt_models,
+        dbt_retries=dbt_retries,
+        profile=profile,
+        spool_policy=spool_policy,
+        backpressure_policy=backpressure_policy,
     )
 
+    if source.get('compaction'):
+        compaction_dag_id = f"{source['name']}_compaction_dag"
+        globals()[compaction_dag_id] = create_compaction_dag(
+            dag_id=compaction_dag_id,
+            raw_table_name=raw_table_name,
+            compaction=source['compaction'],
+        )
+
 
 
 
@@ -1,5 +1,8 @@
 {% macro create_raw_tables() %}
-    {% do run_query("CREATE TABLE IF NOT EXISTS CB_ISS_LOCATION (LATITUDE FLOAT, LONGITUDE FLOAT, API_TIMESTAMP TIMESTAMP_LTZ, LOAD_TS TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP())") %}
+    {% do run_query("CREATE TABLE IF NOT EXISTS CB_ISS_LOCATION (LATITUDE FLOAT, LONGITUDE FLOAT, API_TIMESTAMP TIMESTAMP_LTZ, LOAD_TS TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()) CLUSTER BY (LOAD_TS)") %}
+    {% do run_query("CREATE TABLE IF NOT EXISTS CB_ISS_LOCATION_ROLLUP (BUCKET_START TIMESTAMP_LTZ, LATITUDE FLOAT, LONGITUDE FLOAT, API_TIMESTAMP TIMESTAMP_LTZ, LOAD_TS TIMESTAMP_LTZ, POINT_COUNT INTEGER) CLUSTER BY (BUCKET_START)") %}
+    {% do run_query("CREATE STAGE IF NOT EXISTS CB_ARCHIVE_STAGE FILE_FORMAT = (TYPE = PARQUET)") %}
+    {% do run_query("CREATE TABLE IF NOT EXISTS CB_SPOOL_LEDGER (TABLE_NAME VARCHAR, SEGMENT_ID VARCHAR, RECORD_COUNT INTEGER, LOADED_AT TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()) CLUSTER BY (TABLE_NAME, SEGMENT_ID)") %}
     {% do run_query("CREATE TABLE IF NOT EXISTS CB_NASA_APOD (COPYRIGHT VARCHAR, APOD_DATE TIMESTAMP_LTZ, EXPLANATION VARCHAR, HD_URL VARCHAR, MEDIA_TYPE VARCHAR, SERVICE_VERSION VARCHAR, TITLE VARCHAR, URL VARCHAR, LOAD_TS TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP())") %}
     {% do run_query("""
         CREATE TABLE IF NOT EXISTS CB_ASTRONAUTS (
@@ -27,15 +30,19 @@
             SPACEWALKS_COUNT            INTEGER,
             LAST_FLIGHT                 TIMESTAMP_LTZ,
             FIRST_FLIGHT                TIMESTAMP_LTZ,
+            NAME_KEY                    VARCHAR,
             LOAD_TS                     TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()
         )
+        CLUSTER BY (NAME_KEY)
     """) %}
     {% do run_query("""
         CREATE TABLE IF NOT EXISTS CB_IN_SPACE (
             NAME                        VARCHAR,
             CRAFT                       VARCHAR,
+            NAME_KEY                    VARCHAR,
             LOAD_TS                     TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()
         )
+        CLUSTER BY (NAME_KEY)
     """) %}
     {% do log('create_raw_tables macro executed', info=True) %}
 {% endmacro %}
\ No newline at end of file
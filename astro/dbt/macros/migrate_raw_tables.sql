@@ -0,0 +1,10 @@
+{% macro migrate_raw_tables() %}
+    {#- One-off DDL for raw tables created by an earlier create_raw_tables. Run it once
+        with `make dbt-migrate` after upgrading, not as an on-run-start hook. -#}
+    {% do run_query("ALTER TABLE CB_ISS_LOCATION CLUSTER BY (LOAD_TS)") %}
+    {% for table in ['CB_ASTRONAUTS', 'CB_IN_SPACE'] %}
+        {% do run_query("ALTER TABLE " ~ table ~ " ADD COLUMN IF NOT EXISTS NAME_KEY VARCHAR") %}
+        {% do run_query("ALTER TABLE " ~ table ~ " CLUSTER BY (NAME_KEY)") %}
+    {% endfor %}
+    {% do log('migrate_raw_tables macro executed', info=True) %}
+{% endmacro %}
@@ -8,8 +8,9 @@ in_space_now as (
 
     select
         *,
-        row_number() over (partition by lower(trim(NAME)) order by LOAD_TS desc) as rn
+        row_number() over (partition by NAME_KEY order by LOAD_TS desc) as rn
     from {{ source('cargo_bay', 'in_space') }}
+    where NAME_KEY is not null
 
 ),
 
@@ -45,7 +46,7 @@ astronauts_enriched as (
 
     from spacedevs_astronauts s
     left join in_space_now i
-        on lower(trim(s.NAME)) = lower(trim(i.NAME))
+        on s.NAME_KEY = i.NAME_KEY
         and i.rn = 1
 
 )
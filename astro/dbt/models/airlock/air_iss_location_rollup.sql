@@ -0,0 +1,19 @@
+with iss_location_rollup_source as (
+    select
+        BUCKET_START,
+        LOAD_TS as RETRIEVED_AT,
+        LATITUDE::double as LATITUDE,
+        LONGITUDE::double as LONGITUDE,
+        API_TIMESTAMP::timestamp_ntz as API_TIMESTAMP,
+        POINT_COUNT
+    from {{ source('cargo_bay', 'iss_location_rollup') }}
+)
+
+select
+    BUCKET_START,
+    RETRIEVED_AT,
+    LATITUDE,
+    LONGITUDE,
+    API_TIMESTAMP,
+    POINT_COUNT
+from iss_location_rollup_source
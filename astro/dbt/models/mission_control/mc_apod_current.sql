@@ -0,0 +1,16 @@
+with apod as (
+    select * from {{ ref('air_apod') }}
+)
+
+select
+    COPYRIGHT,
+    APOD_DATE,
+    EXPLANATION,
+    HD_URL,
+    MEDIA_TYPE,
+    TITLE,
+    URL,
+    IMAGE_URL,
+    LOAD_TS
+from apod
+qualify row_number() over (order by APOD_DATE desc, LOAD_TS desc) = 1
@@ -0,0 +1,8 @@
+select
+    LATITUDE,
+    LONGITUDE,
+    RETRIEVED_AT,
+    DISTANCE_TRAVELED_KM,
+    SPEED_KPH
+from {{ ref('mc_iss_location') }}
+qualify row_number() over (order by RETRIEVED_AT desc) = 1
@@ -0,0 +1,27 @@
+{{ config(materialized='view') }}
+
+with hot_window as (
+    select
+        RETRIEVED_AT,
+        LATITUDE,
+        LONGITUDE,
+        API_TIMESTAMP,
+        1 as POINT_COUNT,
+        'raw' as RESOLUTION
+    from {{ ref('air_iss_location') }}
+),
+
+compacted as (
+    select
+        RETRIEVED_AT,
+        LATITUDE,
+        LONGITUDE,
+        API_TIMESTAMP,
+        POINT_COUNT,
+        'rollup' as RESOLUTION
+    from {{ ref('air_iss_location_rollup') }}
+)
+
+select * from compacted
+union all
+select * from hot_window
@@ -10,6 +10,8 @@ import time
 from typing import List, Dict, Any
 import requests
 from include.utils.api_strategy import ApiStrategy
+from include.utils.json_stream import read_projected
+from include.utils.name_normalizer import normalize_name
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,14 @@ class AstronautsStrategy(ApiStrategy):
     """
     Fetches all astronaut data from the paginated Space Devs API.
     """
+    fields = (
+        "id", "url", "name", "status", "type", "in_space", "time_in_space",
+        "eva_time", "age", "date_of_birth", "date_of_death", "nationality",
+        "bio", "twitter", "instagram", "wiki", "agency", "profile_image",
+        "profile_image_thumbnail", "flights_count", "landings_count",
+        "spacewalks_count", "last_flight", "first_flight",
+    )
+
     def fetch_data(self) -> List[Dict[str, Any]]:
         logger.info("Fetching all astronaut data from paginated Space Devs API...")
         
@@ -28,12 +38,16 @@ class AstronautsStrategy(ApiStrategy):
         
         while url:
             try:
-                response = requests.get(url)
-                response.raise_for_status()
-                data = response.json()
-                all_astronauts.extend(data.get("results", []))
+                with requests.get(url, stream=True) as response:
+                    response.raise_for_status()
+                    results, meta = read_projected(
+                        response, "results", fields=self.fields, meta_keys=("next",)
+                    )
+                for astronaut in results:
+                    astronaut["NAME_KEY"] = normalize_name(astronaut.get("name"))
+                    all_astronauts.append(astronaut)
                 
-                url = data.get("next")
+                url = meta.get("next")
                 if url:
                     logger.info(f"Fetching next page: {url}")
                     logger.info("Rate limit requires a 4-minute delay before the next request.")
@@ -6,6 +6,8 @@ import logging
 from typing import List, Dict, Any
 import requests
 from include.utils.api_strategy import ApiStrategy
+from include.utils.json_stream import read_projected
+from include.utils.name_normalizer import normalize_name
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +17,16 @@ class InSpaceStrategy(ApiStrategy):
     """
     Fetches the list of astronauts currently in space from Open Notify's API.
     """
+    fields = ("name", "craft")
+
     def fetch_data(self) -> List[Dict[str, Any]]:
         logger.info("Fetching in space data from Open Notify API...")
         try:
-            response = requests.get(IN_SPACE_URL)
-            response.raise_for_status()
-            data = response.json()
-            people_in_space = data.get("people", [])
+            with requests.get(IN_SPACE_URL, stream=True) as response:
+                response.raise_for_status()
+                people_in_space, _ = read_projected(response, "people", fields=self.fields)
+            for person in people_in_space:
+                person["NAME_KEY"] = normalize_name(person.get("name"))
             logger.info(f"Fetched {len(people_in_space)} people in space.")
             return people_in_space
         except Exception as e:
@@ -5,7 +5,7 @@ This module defines the abstract base class for all API client strategies,
 ensuring a consistent interface for different data sources.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 
 class ApiStrategy(ABC):
@@ -14,7 +14,13 @@ class ApiStrategy(ABC):
     
     Concrete implementations must provide the fetch_data method to retrieve data
     from their respective APIs and return it in a standardized format.
+
+    `fields` is a declaration only: strategies that read their responses with
+    `include.utils.json_stream.read_projected` pass it along so every other
+    record key is discarded. The base class does not use it.
     """
+
+    fields: Optional[Tuple[str, ...]] = None
     
     @abstractmethod
     def fetch_data(self) -> List[Dict[str, Any]]:
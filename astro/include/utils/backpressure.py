@@ -0,0 +1,147 @@
+"""
+Backpressure-aware scheduling for high-frequency DAGs.
+
+This module decides at the start of each DAG run whether the run should do
+any work. Runs whose data interval is already stale are dropped. While the
+smoothed end-to-end latency exceeds the schedule period, runs that start
+sooner after the previous full run finished than that overrun are coalesced
+into the next one, so the effective poll interval stretches with load; a
+pipeline that keeps up is never throttled.
+Intervals the scheduler never created (it only schedules the latest interval
+once a long run finishes) are recorded as coalesced too. State is kept per DAG
+in an Airflow Variable, and every dropped or coalesced interval is recorded
+there and in Airflow Stats.
+"""
+import logging
+from typing import Any, Dict
+
+import pendulum
+from airflow.models import Variable
+from airflow.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_INTERVALS_KEPT = 100
+
+
+def _state_key(dag_id: str) -> str:
+    return f"backpressure__{dag_id}"
+
+
+def _load_state(dag_id: str) -> Dict[str, Any]:
+    return Variable.get(_state_key(dag_id), default_var={}, deserialize_json=True)
+
+
+def _save_state(dag_id: str, state: Dict[str, Any]) -> None:
+    Variable.set(_state_key(dag_id), state, serialize_json=True)
+
+
+def _record_skip(
+    dag_id: str,
+    state: Dict[str, Any],
+    reason: str,
+    data_interval_start: pendulum.DateTime,
+    data_interval_end: pendulum.DateTime,
+) -> None:
+    counts = state.setdefault("skip_counts", {})
+    counts[reason] = counts.get(reason, 0) + 1
+    skipped = state.setdefault("skipped_intervals", [])
+    skipped.append({
+        "reason": reason,
+        "interval_start": data_interval_start.isoformat(),
+        "interval_end": data_interval_end.isoformat(),
+    })
+    del skipped[:-SKIPPED_INTERVALS_KEPT]
+    _save_state(dag_id, state)
+    Stats.incr(f"space_cadet.backpressure.{dag_id}.{reason}")
+    logger.warning(
+        "DAG: %s - %s interval %s to %s",
+        dag_id, reason.capitalize(), data_interval_start, data_interval_end,
+    )
+
+
+def should_run(
+    dag_id: str,
+    data_interval_start: pendulum.DateTime,
+    data_interval_end: pendulum.DateTime,
+    is_manual: bool = False,
+    max_staleness_seconds: float = 120,
+    max_coalesce_seconds: float = 600,
+) -> bool:
+    """
+    Decide whether a scheduled run should proceed.
+
+    A run is dropped when it starts more than `max_staleness_seconds` after
+    the end of its data interval. It is coalesced when the smoothed end-to-end
+    latency exceeds the schedule period (the length of the data interval) and
+    less time than that overrun (capped at `max_coalesce_seconds`) has passed
+    since the previous full run finished. A gap between the previous scheduled
+    run's interval and this one is recorded as a coalesced interval. Manual
+    runs always proceed.
+
+    Args:
+        dag_id: DAG identifier
+        data_interval_start: Start of the run's data interval
+        data_interval_end: End of the run's data interval
+        is_manual: Whether the run was triggered manually
+        max_staleness_seconds: Maximum delay between the interval end and the
+                               run start before the run is dropped
+        max_coalesce_seconds: Longest overrun to wait out after a full run,
+                              so one slow outlier cannot stall the DAG
+
+    Returns:
+        bool: True if the run should proceed.
+    """
+    state = _load_state(dag_id)
+    now = pendulum.now("UTC")
+
+    if not is_manual:
+        last_interval_end = state.get("last_interval_end")
+        state["last_interval_end"] = data_interval_end.isoformat()
+        if last_interval_end:
+            gap_start = pendulum.parse(last_interval_end)
+            if gap_start < data_interval_start:
+                _record_skip(dag_id, state, "coalesced", gap_start, data_interval_start)
+
+        staleness = (now - data_interval_end).total_seconds()
+        if staleness > max_staleness_seconds:
+            _record_skip(dag_id, state, "dropped", data_interval_start, data_interval_end)
+            return False
+
+        period = (data_interval_end - data_interval_start).total_seconds()
+        overrun = state.get("latency_ewma_seconds", 0) - period
+        last_finished = state.get("last_finished_at")
+        if overrun > 0 and last_finished:
+            since_last = (now - pendulum.parse(last_finished)).total_seconds()
+            if since_last < min(overrun, max_coalesce_seconds):
+                _record_skip(dag_id, state, "coalesced", data_interval_start, data_interval_end)
+                return False
+
+    _save_state(dag_id, state)
+    return True
+
+
+def record_latency(dag_id: str, started_at: pendulum.DateTime, smoothing: float = 0.3) -> float:
+    """
+    Fold a full run's end-to-end latency into the DAG's smoothed latency and
+    record when it finished.
+
+    Args:
+        dag_id: DAG identifier
+        started_at: When the run started
+        smoothing: Weight of the newest observation in the moving average
+
+    Returns:
+        float: The updated smoothed latency in seconds.
+    """
+    state = _load_state(dag_id)
+    now = pendulum.now("UTC")
+    latency = (now - started_at).total_seconds()
+    previous = state.get("latency_ewma_seconds")
+    ewma = latency if previous is None else smoothing * latency + (1 - smoothing) * previous
+    state["latency_ewma_seconds"] = ewma
+    state["last_finished_at"] = now.isoformat()
+    _save_state(dag_id, state)
+    Stats.timing(f"space_cadet.backpressure.{dag_id}.latency", latency * 1000)
+    logger.info("DAG: %s - End-to-end latency %.1fs, smoothed %.1fs", dag_id, latency, ewma)
+    return ewma
@@ -0,0 +1,125 @@
+"""
+JSON parsing with field projection.
+
+This module reads API responses keeping only the fields a strategy declares.
+Large responses are parsed incrementally from the byte stream, so nested
+subtrees that are never loaded (flight lists, nested launch objects, etc.) are
+discarded while parsing instead of after the whole document has been built in
+memory. Small responses are parsed with `response.json()`, which is several
+times faster and, with little to discard, uses no more memory
+(see benchmarks/json_stream_benchmark.py).
+"""
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+import ijson
+import requests
+from ijson.common import ObjectBuilder
+
+# Responses at least this large on the wire (or of unknown length) are streamed.
+STREAM_MIN_BYTES = 1024 * 1024
+
+_OPEN_EVENTS = frozenset(("start_map", "start_array"))
+_CLOSE_EVENTS = frozenset(("end_map", "end_array"))
+_STRUCTURE_EVENTS = _OPEN_EVENTS | {"map_key"}
+
+
+def parse_projected(
+    stream: BinaryIO,
+    items_prefix: str,
+    fields: Optional[Iterable[str]] = None,
+    meta_keys: Iterable[str] = (),
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Parse the array at `items_prefix` from a JSON byte stream, keeping only `fields`.
+
+    Args:
+        stream: File-like object yielding the raw JSON bytes (e.g. `response.raw`)
+        items_prefix: ijson prefix of the array of records (e.g. "results")
+        fields: Top-level keys to keep on each record. None keeps every key.
+        meta_keys: Top-level scalar keys to return alongside the records
+                   (e.g. "next" for paginated APIs)
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any]]: The projected records and
+            the requested top-level metadata values.
+    """
+    item_prefix = f"{items_prefix}.item"
+    wanted = None if fields is None else set(fields)
+    meta_wanted = set(meta_keys)
+
+    items: List[Dict[str, Any]] = []
+    meta: Dict[str, Any] = {}
+    current: Optional[Dict[str, Any]] = None
+    builder: Optional[ObjectBuilder] = None
+    capture_key: Optional[str] = None
+    depth = 0
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if capture_key is not None:
+            # Inside the value of a record key: either build it or skip it.
+            if event in _OPEN_EVENTS:
+                depth += 1
+            elif event in _CLOSE_EVENTS:
+                depth -= 1
+            if builder is not None:
+                builder.event(event, value)
+            if depth == 0:
+                if builder is not None:
+                    current[capture_key] = builder.value
+                capture_key = builder = None
+            continue
+
+        if prefix == item_prefix:
+            if event == "map_key":
+                capture_key = value
+                builder = ObjectBuilder() if wanted is None or value in wanted else None
+            elif event == "start_map":
+                current = {}
+            elif event == "end_map":
+                items.append(current)
+                current = None
+        elif prefix in meta_wanted and event not in _STRUCTURE_EVENTS:
+            meta[prefix] = value
+
+    return items, meta
+
+
+def read_projected(
+    response: requests.Response,
+    items_prefix: str,
+    fields: Optional[Iterable[str]] = None,
+    meta_keys: Iterable[str] = (),
+    stream_min_bytes: int = STREAM_MIN_BYTES,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Read the records at `items_prefix` from a response opened with `stream=True`.
+
+    Responses whose Content-Length is below `stream_min_bytes` are parsed with
+    `response.json()` and projected afterwards; larger or chunked responses are
+    parsed as a stream with `parse_projected`.
+
+    Args:
+        response: Response of a `requests.get(..., stream=True)` call
+        items_prefix: Dotted path of the array of records (e.g. "results")
+        fields: Top-level keys to keep on each record. None keeps every key.
+        meta_keys: Top-level scalar keys to return alongside the records
+        stream_min_bytes: Content-Length from which the response is streamed
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any]]: The projected records and
+            the requested top-level metadata values.
+    """
+    content_length = response.headers.get("Content-Length")
+    if content_length is None or int(content_length) >= stream_min_bytes:
+        response.raw.decode_content = True
+        return parse_projected(response.raw, items_prefix, fields=fields, meta_keys=meta_keys)
+
+    data = response.json()
+    meta = {key: data[key] for key in meta_keys if key in data}
+    items: Any = data
+    for key in items_prefix.split("."):
+        items = items.get(key) if isinstance(items, dict) else None
+    items = items or []
+    if fields is not None:
+        wanted = set(fields)
+        items = [{key: value for key, value in item.items() if key in wanted} for item in items]
+    return items, meta
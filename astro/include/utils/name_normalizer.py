@@ -0,0 +1,88 @@
+"""
+Name normalization utilities for matching astronauts across data sources.
+
+This module builds a stable NAME_KEY for a person's name so that records from
+the SpaceDevs and Open Notify APIs can be joined with a plain equi-join instead
+of evaluating string functions on both sides of the join in Snowflake.
+"""
+import re
+import unicodedata
+from typing import Dict, Optional
+
+# Transliteration variants of given names that SpaceDevs and Open Notify spell
+# differently (mostly Russian names), keyed by the normalized variant token and
+# mapping to the token used in every key.
+NAME_TOKEN_ALIASES: Dict[str, str] = {
+    "aleksandr": "alexander",
+    "alexandr": "alexander",
+    "aleksei": "alexey",
+    "aleksey": "alexey",
+    "alexei": "alexey",
+    "anatoli": "anatoly",
+    "anatoliy": "anatoly",
+    "andrei": "andrey",
+    "dmitri": "dmitry",
+    "dmitriy": "dmitry",
+    "evgeniy": "yevgeny",
+    "evgeny": "yevgeny",
+    "fyodor": "fedor",
+    "gennadi": "gennady",
+    "gennadiy": "gennady",
+    "nikolay": "nikolai",
+    "sergei": "sergey",
+    "sergiy": "sergey",
+    "valeri": "valery",
+    "valeriy": "valery",
+    "vasili": "vasily",
+    "vasiliy": "vasily",
+    "yuriy": "yuri",
+    "yury": "yuri",
+}
+
+# Letters that NFKD leaves undecomposed, mapped to their usual Latin spelling.
+# Applied after casefolding, so only lowercase forms are needed (ß is already
+# folded to "ss" by casefold).
+_TRANSLITERATIONS = str.maketrans({
+    "ø": "o",
+    "ł": "l",
+    "æ": "ae",
+    "œ": "oe",
+    "đ": "d",
+    "ð": "d",
+    "þ": "th",
+    "ı": "i",
+    "ħ": "h",
+})
+# Unicode-aware: keeps letters and digits from any script, drops punctuation and "_".
+_NON_WORD = re.compile(r"[^\w\s]|_")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """
+    Build a normalized join key for a person's name.
+
+    The key is produced by stripping diacritics (e.g. "Jérôme" and "Jerome"
+    match), transliterating letters without a decomposition (e.g. "Bjørn" and
+    "Bjorn" match), casefolding, replacing punctuation with spaces, collapsing
+    whitespace, mapping transliteration variants through NAME_TOKEN_ALIASES
+    (e.g. "Sergei" and "Sergey" match) and sorting the name tokens so that
+    "Family Given" and "Given Family" orderings produce the same key. Letters
+    from non-Latin scripts are kept as-is, so Cyrillic or CJK names still
+    produce a key.
+
+    Args:
+        name: The raw name as returned by the API
+
+    Returns:
+        Optional[str]: The normalized key, or None if the name is empty.
+    """
+    if not name:
+        return None
+
+    folded = unicodedata.normalize("NFKD", name)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    folded = folded.casefold().translate(_TRANSLITERATIONS)
+    folded = _NON_WORD.sub(" ", folded)
+    tokens = sorted(NAME_TOKEN_ALIASES.get(token, token) for token in _WHITESPACE.split(folded.strip()))
+    return " ".join(token for token in tokens if token) or None
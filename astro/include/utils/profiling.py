@@ -0,0 +1,69 @@
+"""
+Opt-in sampling profiler for pipeline tasks.
+
+This module wraps a block of code with pyinstrument's sampling profiler and
+saves the result as a speedscope flamegraph keyed by DAG, run ID, task and
+try number, so slow production runs can be diagnosed after the fact and a
+retry never overwrites the profile of the attempt that failed. When profiling
+is off the wrapper does nothing beyond a single boolean check.
+"""
+import logging
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+PROFILE_OUTPUT_DIR = Path(os.environ.get("PROFILE_OUTPUT_DIR", "/tmp/space_cadet_profiles"))
+PROFILE_INTERVAL_SECONDS = 0.001
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def profile_path(*parts: str) -> Path:
+    """Build the artifact path for a profile, making each part filesystem-safe."""
+    *dirs, name = [_UNSAFE_CHARS.sub("_", part) for part in parts]
+    return PROFILE_OUTPUT_DIR.joinpath(*dirs, f"{name}.speedscope.json")
+
+
+@contextmanager
+def profile_run(enabled: bool, *key: str) -> Iterator[None]:
+    """
+    Profile the wrapped block and save a speedscope artifact if enabled.
+
+    Args:
+        enabled: Whether to profile. When False this is a no-op.
+        key: Path parts identifying the artifact,
+             e.g. (dag_id, run_id, task_id, f"try_{try_number}")
+
+    Example:
+        with profile_run(True, "iss_location_api_dag", run_id, "flush_spool_task", "try_1"):
+            spool.flush(...)
+    """
+    if not enabled:
+        yield
+        return
+
+    try:
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+    except ImportError:
+        logger.warning("Profiling requested but pyinstrument is not installed; running unprofiled.")
+        yield
+        return
+
+    profiler = Profiler(interval=PROFILE_INTERVAL_SECONDS)
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        path = profile_path(*key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(profiler.output(renderer=SpeedscopeRenderer()))
+            logger.info("Saved profile to %s", path)
+        except OSError as e:
+            logger.error("Could not save profile to %s: %s", path, e)
@@ -0,0 +1,131 @@
+"""
+Utility for compacting append-only Snowflake tables.
+
+This module keeps append-only raw tables bounded in size by rolling rows
+older than a configurable hot window into a time-bucketed rollup table,
+optionally archiving them to a stage as compressed Parquet, and pruning them
+from the raw table.
+"""
+import logging
+from typing import List, Optional
+from airflow.providers.snowflake.hooks.snowflake import SnowflakeHook # type: ignore
+
+logger = logging.getLogger(__name__)
+
+def compact_table(
+    table_name: str,
+    rollup_table_name: str,
+    rollup_cols: List[str],
+    snowflake_conn_id: str,
+    database: str,
+    schema: str,
+    ts_col: str = "LOAD_TS",
+    hot_window_hours: int = 24,
+    rollup_minutes: int = 10,
+    rollup_retention_days: Optional[int] = None,
+    archive_stage: Optional[str] = None,
+) -> None:
+    """
+    Roll up, archive and prune raw rows that fall outside the hot window.
+
+    Rows older than the hot window are grouped into buckets of
+    `rollup_minutes` on `ts_col`. For every bucket the first point (by
+    `ts_col`) is kept along with the number of raw points it represents, so
+    coordinates stay real observations rather than averages. The cutoff is
+    aligned to a bucket boundary. Rows can still arrive for a bucket that was
+    already rolled up, e.g. when spooled records are flushed after an outage
+    longer than the hot window, so buckets are merged into the rollup table:
+    the point counts are added and the earlier first point is kept, and a
+    bucket never appears twice.
+
+    The rollup merge and the raw delete run in a single transaction. The
+    archive unload cannot take part in it, so it is written under a prefix
+    keyed by the exact timestamp of the oldest archived row: until a prune
+    commits, that row stays the oldest one, and a retry (or the next
+    scheduled run) clears the prefix and re-unloads the same rows plus any
+    newer ones in place instead of failing on existing files or archiving
+    rows twice.
+
+    Args:
+        table_name: Name of the append-only raw table
+        rollup_table_name: Name of the rollup table. Must have a BUCKET_START
+                           column, the `rollup_cols`, `ts_col` and POINT_COUNT.
+        rollup_cols: Columns to carry into the rollup table
+        snowflake_conn_id: Airflow connection ID for Snowflake
+        database: Target database name
+        schema: Target schema name
+        ts_col: Timestamp column used for the hot window and bucketing
+        hot_window_hours: Number of hours of full-resolution rows to keep
+        rollup_minutes: Size of the rollup buckets in minutes
+        rollup_retention_days: If set, rollup rows older than this are deleted
+        archive_stage: If set, raw rows are unloaded to this stage as
+                       Parquet before they are pruned
+    """
+    hook = SnowflakeHook(snowflake_conn_id=snowflake_conn_id)
+    table_name = table_name.upper()
+    rollup_table_name = rollup_table_name.upper()
+    ts_col = ts_col.upper()
+    cols = [col.upper() for col in rollup_cols]
+
+    with hook.get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"USE DATABASE {database}")
+        cursor.execute(f"USE SCHEMA {schema}")
+        cursor.execute(
+            "SET COMPACTION_CUTOFF = ("
+            f"SELECT TIME_SLICE(DATEADD(hour, -{int(hot_window_hours)}, CURRENT_TIMESTAMP()), "
+            f"{int(rollup_minutes)}, 'MINUTE'))"
+        )
+
+        if archive_stage:
+            cursor.execute(
+                f"SELECT MIN({ts_col}) FROM {table_name} WHERE {ts_col} < $COMPACTION_CUTOFF"
+            )
+            archive_start = cursor.fetchone()[0]
+            if archive_start is None:
+                logger.info("No %s rows older than the hot window to archive", table_name)
+            else:
+                location = f"@{archive_stage}/{table_name.lower()}/{archive_start:%Y/%m/%d/%H%M%S%f}/"
+                cursor.execute(f"REMOVE {location}")
+                cursor.execute(
+                    f"COPY INTO {location} "
+                    f"FROM (SELECT * FROM {table_name} WHERE {ts_col} < $COMPACTION_CUTOFF) "
+                    "FILE_FORMAT = (TYPE = PARQUET COMPRESSION = SNAPPY) "
+                    "HEADER = TRUE OVERWRITE = TRUE"
+                )
+                logger.info("Archived %s rows older than the hot window to %s", table_name, location)
+
+        first_values = ", ".join(f"MIN_BY({col}, {ts_col}) AS {col}" for col in cols)
+        merged_values = ", ".join(f"{col} = IFF(s.{ts_col} < r.{ts_col}, s.{col}, r.{col})" for col in cols)
+        try:
+            cursor.execute("BEGIN")
+            cursor.execute(
+                f"MERGE INTO {rollup_table_name} r USING ("
+                f"SELECT TIME_SLICE({ts_col}, {int(rollup_minutes)}, 'MINUTE') AS BUCKET_START, "
+                f"{first_values}, MIN({ts_col}) AS {ts_col}, COUNT(*) AS POINT_COUNT "
+                f"FROM {table_name} WHERE {ts_col} < $COMPACTION_CUTOFF "
+                "GROUP BY BUCKET_START"
+                ") s ON r.BUCKET_START = s.BUCKET_START "
+                f"WHEN MATCHED THEN UPDATE SET {merged_values}, "
+                f"{ts_col} = LEAST(r.{ts_col}, s.{ts_col}), POINT_COUNT = r.POINT_COUNT + s.POINT_COUNT "
+                f"WHEN NOT MATCHED THEN INSERT (BUCKET_START, {', '.join(cols)}, {ts_col}, POINT_COUNT) "
+                f"VALUES (s.BUCKET_START, {', '.join(f's.{col}' for col in cols)}, s.{ts_col}, s.POINT_COUNT)"
+            )
+            rolled_up = cursor.rowcount
+            cursor.execute(f"DELETE FROM {table_name} WHERE {ts_col} < $COMPACTION_CUTOFF")
+            pruned = cursor.rowcount
+
+            if rollup_retention_days is not None:
+                cursor.execute(
+                    f"DELETE FROM {rollup_table_name} "
+                    f"WHERE BUCKET_START < DATEADD(day, -{int(rollup_retention_days)}, CURRENT_TIMESTAMP())"
+                )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+        logger.info(
+            "Compacted %s: %s buckets written to %s, %s raw rows pruned",
+            table_name, rolled_up, rollup_table_name, pruned,
+        )
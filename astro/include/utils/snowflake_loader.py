@@ -3,91 +3,366 @@ Utility for loading data into Snowflake from various sources.
 
 This module provides functionality to efficiently load pandas DataFrames into
 Snowflake tables with support for different loading strategies and data types.
+Column types are taken from the target table's schema, which is fetched once
+per process and compiled into a cast plan that is reused for every load.
 """
+import json
 import logging
+import math
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import pandas as pd
 from airflow.providers.snowflake.hooks.snowflake import SnowflakeHook # type: ignore
 from snowflake.connector.pandas_tools import write_pandas
 
 logger = logging.getLogger(__name__)
 
-def load_to_snowflake(
+VARIANT_TYPES = {"VARIANT", "OBJECT", "ARRAY"}
+SPOOL_LEDGER_TABLE = "CB_SPOOL_LEDGER"
+
+# (database, schema, table) -> [(column_name, data_type, numeric_scale)]
+_SCHEMA_CACHE: Dict[Tuple[str, str, str], List[Tuple[str, str, Optional[int]]]] = {}
+# (database, schema, table) -> [(column_name, caster)]
+_CAST_PLAN_CACHE: Dict[Tuple[str, str, str], List[Tuple[str, Callable[[pd.Series], pd.Series]]]] = {}
+
+_json_encode = json.JSONEncoder(default=str, separators=(",", ":")).encode
+
+
+def _to_int(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series, errors="coerce").astype("Int64")
+
+
+def _to_float(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series, errors="coerce").astype("float64")
+
+
+def _to_bool(series: pd.Series) -> pd.Series:
+    return series.astype("boolean")
+
+
+def _to_string(series: pd.Series) -> pd.Series:
+    return series.astype("string")
+
+
+def _to_timestamp(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, "tz", None) is not None:
+            return series.dt.tz_convert("UTC").dt.tz_localize(None)
+        return series
+    return pd.to_datetime(series, utc=True, errors="coerce").dt.tz_localize(None)
+
+
+def _to_date(series: pd.Series) -> pd.Series:
+    # An Arrow date32 dtype stages as DATE even when every value is NULL.
+    return _to_timestamp(series).astype("date32[pyarrow]")
+
+
+def _to_json(series: pd.Series) -> pd.Series:
+    values = [
+        None if value is None or (isinstance(value, float) and math.isnan(value)) else _json_encode(value)
+        for value in series.tolist()
+    ]
+    return pd.Series(values, index=series.index, dtype="object")
+
+
+def _caster_for(data_type: str, scale: Optional[int]) -> Callable[[pd.Series], pd.Series]:
+    if data_type in VARIANT_TYPES:
+        return _to_json
+    if data_type == "NUMBER":
+        return _to_int if not scale else _to_float
+    if data_type in ("FLOAT", "REAL", "DOUBLE"):
+        return _to_float
+    if data_type == "BOOLEAN":
+        return _to_bool
+    if data_type == "DATE":
+        return _to_date
+    if data_type.startswith("TIMESTAMP"):
+        return _to_timestamp
+    return _to_string
+
+
+def _staging_type(data_type: str, scale: Optional[int]) -> str:
+    if data_type in VARIANT_TYPES or data_type == "TEXT":
+        return "VARCHAR"
+    if data_type == "NUMBER":
+        return f"NUMBER(38, {scale or 0})"
+    return data_type
+
+
+def get_table_schema(
+    conn: Any,
+    database: str,
+    schema: str,
+    table_name: str,
+) -> List[Tuple[str, str, Optional[int]]]:
+    """
+    Fetch the column names and types of a Snowflake table, cached per process.
+
+    Args:
+        conn: Open Snowflake connection
+        database: Database name
+        schema: Schema name
+        table_name: Table name
+
+    Returns:
+        List[Tuple[str, str, Optional[int]]]: (column name, data type, numeric scale)
+            for each column, in table order.
+
+    Raises:
+        Exception: If the table does not exist or is not visible to the role.
+    """
+    key = (database.upper(), schema.upper(), table_name.upper())
+    if key not in _SCHEMA_CACHE:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT COLUMN_NAME, DATA_TYPE, NUMERIC_SCALE FROM {key[0]}.INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (key[1], key[2]),
+        )
+        columns = [(name, data_type, scale) for name, data_type, scale in cursor.fetchall()]
+        if not columns:
+            raise Exception(f"Table {'.'.join(key)} not found or has no columns visible to this role.")
+        _SCHEMA_CACHE[key] = columns
+        logger.debug("Cached schema for %s: %s", ".".join(key), _SCHEMA_CACHE[key])
+    return _SCHEMA_CACHE[key]
+
+
+def get_cast_plan(
+    conn: Any,
+    database: str,
+    schema: str,
+    table_name: str,
+) -> List[Tuple[str, Callable[[pd.Series], pd.Series]]]:
+    """
+    Compile, or return the cached, cast plan for a Snowflake table.
+
+    Returns:
+        List[Tuple[str, Callable]]: (column name, caster) for each column of the table.
+    """
+    key = (database.upper(), schema.upper(), table_name.upper())
+    if key not in _CAST_PLAN_CACHE:
+        _CAST_PLAN_CACHE[key] = [
+            (name, _caster_for(data_type, scale))
+            for name, data_type, scale in get_table_schema(conn, database, schema, table_name)
+        ]
+    return _CAST_PLAN_CACHE[key]
+
+
+def apply_cast_plan(
+    df: pd.DataFrame,
+    cast_plan: List[Tuple[str, Callable[[pd.Series], pd.Series]]],
+) -> pd.DataFrame:
+    """
+    Cast a DataFrame's columns to the target table's types.
+
+    Columns that are not part of the target table are dropped. Columns of the
+    target table that are missing from the DataFrame are left out so that
+    Snowflake applies the column default. Values that cannot be cast become
+    NULL, and the number of such values is logged per column.
+    """
+    known = {name for name, _ in cast_plan}
+    unknown = [col for col in df.columns if col not in known]
+    if unknown:
+        logger.warning("Dropping columns not present in target table: %s", unknown)
+
+    columns = {}
+    for name, caster in cast_plan:
+        if name not in df.columns:
+            continue
+        columns[name] = caster(df[name])
+        coerced = int((columns[name].isna() & df[name].notna()).sum())
+        if coerced:
+            logger.warning("Coerced %d malformed value(s) in column %s to NULL", coerced, name)
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _prepare_dataframe(
+    conn: Any,
     data: List[Dict[str, Any]],
+    database: str,
+    schema: str,
+    table_name: str,
+    timestamp_cols: Optional[List[Dict[str, str]]],
+) -> Tuple[pd.DataFrame, List[Tuple[str, str, Optional[int]]], set]:
+    """Build the cast DataFrame for a load and return it with the table schema and its VARIANT columns."""
+    df = pd.DataFrame(data)
+    df.columns = [col.upper() for col in df.columns]
+
+    if timestamp_cols:
+        for col_info in timestamp_cols:
+            col_name = col_info['name'].upper()
+            if col_name in df.columns:
+                unit = col_info.get('unit')
+                logger.debug("Converting column '%s' to datetime (unit: %s)", col_name, unit or 'default')
+                df[col_name] = pd.to_datetime(df[col_name], unit=unit, utc=True).dt.tz_localize(None)
+
+    # Records spooled before loading carry their fetch time; only fill in the rest.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if "LOAD_TS" in df.columns:
+        load_ts = pd.to_datetime(df["LOAD_TS"], utc=True, errors="coerce", format="ISO8601")
+        df["LOAD_TS"] = load_ts.dt.tz_localize(None).fillna(now)
+    else:
+        df["LOAD_TS"] = now
+
+    table_schema = get_table_schema(conn, database, schema, table_name)
+    df = apply_cast_plan(df, get_cast_plan(conn, database, schema, table_name))
+
+    variant_cols = {
+        name for name, data_type, _ in table_schema
+        if data_type in VARIANT_TYPES and name in df.columns
+    }
+
+    logger.debug("DataFrame info before loading to Snowflake")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\n%s", df.info())
+
+    return df, table_schema, variant_cols
+
+
+def _create_staging_table(
+    conn: Any,
+    load_table_name: str,
+    table_schema: List[Tuple[str, str, Optional[int]]],
+    columns: List[str],
+    extra_defs: Tuple[str, ...] = (),
+) -> None:
+    column_defs = [
+        f"{name} {_staging_type(data_type, scale)}"
+        for name, data_type, scale in table_schema
+        if name in columns
+    ]
+    conn.cursor().execute(
+        f"CREATE OR REPLACE TEMPORARY TABLE {load_table_name} ({', '.join(column_defs + list(extra_defs))})"
+    )
+
+
+def _select_list(columns: List[str], variant_cols: set) -> str:
+    return ", ".join(f"PARSE_JSON({col})" if col in variant_cols else col for col in columns)
+
+
+def load_segments_to_snowflake(
+    segments: List[Tuple[str, List[Dict[str, Any]]]],
     table_name: str,
     snowflake_conn_id: str,
     database: str,
     schema: str,
     overwrite: bool = True,
     timestamp_cols: Optional[List[Dict[str, str]]] = None
-) -> None:
+) -> int:
     """
-    Load data into a Snowflake table from a list of dictionaries.
-    
-    The target table must already exist in Snowflake. This function handles
-    data type conversions and provides options for full refresh or append loading.
-    
+    Group-commit spooled segments into a Snowflake table in one bulk load.
+
+    All segments are staged with a single write_pandas call into a temporary
+    table tagged with their segment IDs. The insert into the target table and
+    the record of the loaded segment IDs in CB_SPOOL_LEDGER then commit in one
+    transaction, so replaying a segment that was already loaded is a no-op.
+    For overwrite tables only the newest segment is loaded, since each
+    segment is a full snapshot.
+
+    Segments are flushed oldest first and deleted from the spool once
+    loaded, so no segment older than the oldest one passed in can be
+    replayed. Ledger lookups are bounded to segment IDs from there on, and
+    older ledger rows are pruned in the same transaction.
+
     Args:
-        data: List of dictionaries where each dict represents a row of data
+        segments: [(segment_id, records)] ordered oldest first
         table_name: Name of the target Snowflake table (case-insensitive)
         snowflake_conn_id: Airflow connection ID for Snowflake
         database: Target database name
         schema: Target schema name
-        overwrite: If True, truncates the table before loading (full refresh).
-                  If False, appends to existing data (incremental load).
+        overwrite: If True, replaces the table contents with the newest segment.
+                  If False, appends every segment not yet in the ledger.
         timestamp_cols: Optional list of dicts specifying timestamp columns to convert.
                       Example: [{'name': 'API_TIMESTAMP', 'unit': 's'}]
-                      
+
+    Returns:
+        int: Number of rows inserted into the target table.
+
     Note:
         - Automatically converts column names to uppercase
-        - Adds a LOAD_TS column with the current UTC timestamp
+        - Casts columns to the target table's types and drops unknown columns
+        - VARIANT, OBJECT and ARRAY columns are serialized to JSON and parsed
+          server-side from the staging table
+        - Fills the LOAD_TS column with the current UTC timestamp where records do not carry one
     """
-    if not data:
-        logger.info("No data provided to load. Exiting.")
-        return
+    if not segments:
+        return 0
 
-    hook = SnowflakeHook(snowflake_conn_id=snowflake_conn_id)
     table_name = table_name.upper()
+    load_segments = segments[-1:] if overwrite else segments
+    data = [record for _, records in load_segments for record in records]
+    segment_ids = [segment_id for segment_id, records in load_segments for _ in records]
+
+    hook = SnowflakeHook(snowflake_conn_id=snowflake_conn_id)
 
     with hook.get_conn() as conn:
-        logger.info("Loading %d records into %s (overwrite=%s)", len(data), table_name, overwrite)
-        conn.cursor().execute(f"USE DATABASE {database}")
-        conn.cursor().execute(f"USE SCHEMA {schema}")
-
-        df = pd.DataFrame(data)
-        df.columns = [col.upper() for col in df.columns]
-
-        if timestamp_cols:
-            for col_info in timestamp_cols:
-                col_name = col_info['name'].upper()
-                if col_name in df.columns:
-                    unit = col_info.get('unit')
-                    logger.debug("Converting column '%s' to datetime (unit: %s)", col_name, unit or 'default')
-                    df[col_name] = pd.to_datetime(df[col_name], unit=unit, utc=True).dt.tz_localize(None)
-
-        df["LOAD_TS"] = datetime.now(timezone.utc).replace(tzinfo=None)
-
-        if overwrite:
-            conn.cursor().execute(f"TRUNCATE TABLE IF EXISTS {table_name};")
-            logger.info("Table %s truncated", table_name)
-
-        logger.debug("DataFrame info before loading to Snowflake")
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("\n%s", df.info())
-
-        success, nchunks, nrows, _ = write_pandas(
-            conn=conn,
-            df=df,
-            table_name=table_name,
-            auto_create_table=False,
-            overwrite=False, 
-            use_logical_type=True,
+        logger.info(
+            "Group-committing %d segments (%d records) into %s (overwrite=%s)",
+            len(segments), len(data), table_name, overwrite,
         )
-        
-        if success:
-            print(f"Successfully loaded {nrows} rows into {table_name}.")
-        else:
-            raise Exception(f"Failed to load data into {table_name}.")
+        cursor = conn.cursor()
+        cursor.execute(f"USE DATABASE {database}")
+        cursor.execute(f"USE SCHEMA {schema}")
+
+        load_table_name = f"{table_name}_SPOOL_LOAD"
+        columns: List[str] = []
+        variant_cols: set = set()
+        if data:
+            df, table_schema, variant_cols = _prepare_dataframe(
+                conn, data, database, schema, table_name, timestamp_cols
+            )
+            columns = list(df.columns)
+            df["SPOOL_SEGMENT_ID"] = segment_ids
+            _create_staging_table(conn, load_table_name, table_schema, columns, ("SPOOL_SEGMENT_ID VARCHAR",))
+            success, _, _, _ = write_pandas(
+                conn=conn,
+                df=df,
+                table_name=load_table_name,
+                auto_create_table=False,
+                overwrite=False,
+                use_logical_type=True,
+            )
+            if not success:
+                raise Exception(f"Failed to stage spooled data for {table_name}.")
+
+        ledger_values = ", ".join(["(%s, %s)"] * len(segments))
+        ledger_params = [value for segment_id, records in segments for value in (segment_id, len(records))]
+        oldest_segment_id = segments[0][0]
+        loaded_segments = (
+            f"SELECT SEGMENT_ID FROM {SPOOL_LEDGER_TABLE} WHERE TABLE_NAME = %s AND SEGMENT_ID >= %s"
+        )
+
+        try:
+            cursor.execute("BEGIN")
+            inserted = 0
+            if overwrite:
+                cursor.execute(f"DELETE FROM {table_name}")
+                logger.info("Table %s cleared", table_name)
+            if columns:
+                segment_filter = "" if overwrite else f" WHERE SPOOL_SEGMENT_ID NOT IN ({loaded_segments})"
+                cursor.execute(
+                    f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                    f"SELECT {_select_list(columns, variant_cols)} FROM {load_table_name}{segment_filter}",
+                    () if overwrite else (table_name, oldest_segment_id),
+                )
+                inserted = cursor.rowcount
+            cursor.execute(
+                f"INSERT INTO {SPOOL_LEDGER_TABLE} (TABLE_NAME, SEGMENT_ID, RECORD_COUNT) "
+                f"SELECT %s, v.column1, v.column2 FROM VALUES {ledger_values} v "
+                f"WHERE v.column1 NOT IN ({loaded_segments})",
+                (table_name, *ledger_params, table_name, oldest_segment_id),
+            )
+            cursor.execute(
+                f"DELETE FROM {SPOOL_LEDGER_TABLE} WHERE TABLE_NAME = %s AND SEGMENT_ID < %s",
+                (table_name, oldest_segment_id),
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+        cursor.execute(f"DROP TABLE IF EXISTS {load_table_name}")
+        logger.info("Successfully loaded %d rows into %s", inserted, table_name)
 
-    print("Snowflake connection closed.") 
\ No newline at end of file
+    return inserted
@@ -0,0 +1,157 @@
+"""
+Durable local spool for fetched records.
+
+Records are appended to a per-table directory of write-ahead segment files
+(one JSON-lines file per append, fsynced and atomically renamed into place),
+so a fetch is acknowledged as soon as it is on disk. Each record is stamped
+with LOAD_TS when it is spooled, so it keeps its fetch time however late it
+is flushed. A flusher later group-commits every pending segment of a table
+in one bulk load and removes the segments once the load has committed.
+
+The spool is local to the worker's filesystem, so it assumes a single worker
+host (e.g. the LocalExecutor used by the Astro runtime) and survives restarts
+only if SPOOL_DIR is on a persistent volume. With the Celery or Kubernetes
+executors, appends and flushes may run on different hosts and segments left
+on a lost worker are stranded unless SPOOL_DIR is shared storage.
+"""
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = Path(os.environ.get("SPOOL_DIR", Path(os.environ.get("AIRFLOW_HOME", "/usr/local/airflow")) / "spool"))
+SEGMENT_SUFFIX = ".jsonl"
+
+
+@dataclass
+class SpoolStats:
+    """Depth and lag of a table's spool."""
+    segments: int
+    records: int
+    lag_seconds: float
+
+
+def _table_dir(table_name: str) -> Path:
+    path = SPOOL_DIR / table_name.upper()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _segment_created_at(path: Path) -> float:
+    return int(path.stem.split("-", 1)[0]) / 1e9
+
+
+def append(table_name: str, records: List[Dict[str, Any]]) -> str:
+    """
+    Durably append records to a table's spool as a new segment.
+
+    Args:
+        table_name: Target Snowflake table the records are destined for
+        records: Records to spool. Records without a LOAD_TS are stamped
+                 with the current UTC time.
+
+    Returns:
+        str: The segment ID, which is also used to make loads idempotent.
+    """
+    table_dir = _table_dir(table_name)
+    segment_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+    tmp_path = table_dir / f".{segment_id}.tmp"
+    load_ts = datetime.now(timezone.utc).isoformat()
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({"LOAD_TS": load_ts, **record}, default=str))
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.rename(tmp_path, table_dir / f"{segment_id}{SEGMENT_SUFFIX}")
+    dir_fd = os.open(table_dir, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+    logger.info("Spooled %d records for %s in segment %s", len(records), table_name, segment_id)
+    return segment_id
+
+
+def pending_segments(table_name: str) -> List[Path]:
+    """List a table's committed-to-disk segments, oldest first."""
+    return sorted(_table_dir(table_name).glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def read_segment(path: Path) -> List[Dict[str, Any]]:
+    """Read the records of a segment file."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def stats(table_name: str) -> SpoolStats:
+    """Report the number of pending segments and records and the age of the oldest segment."""
+    segments = pending_segments(table_name)
+    records = 0
+    for path in segments:
+        with open(path, "rb") as f:
+            records += sum(1 for _ in f)
+    lag = time.time() - _segment_created_at(segments[0]) if segments else 0.0
+    return SpoolStats(segments=len(segments), records=records, lag_seconds=lag)
+
+
+def flush(
+    table_name: str,
+    load: Callable[[List[Tuple[str, List[Dict[str, Any]]]]], int],
+    min_records: int = 1,
+    max_lag_seconds: float = 0,
+) -> int:
+    """
+    Group-commit all pending segments of a table in one load.
+
+    The flush is skipped while fewer than `min_records` records are pending
+    and the oldest segment is younger than `max_lag_seconds`. Only one flusher
+    per table runs at a time; segments are deleted after `load` returns, so a
+    crash in between replays them and `load` must be idempotent per segment ID.
+
+    Args:
+        table_name: Table whose spool to flush
+        load: Callable receiving [(segment_id, records)] oldest first and
+              returning the number of rows loaded
+        min_records: Minimum number of pending records to trigger a flush
+        max_lag_seconds: Age of the oldest segment that triggers a flush
+                         regardless of `min_records`
+
+    Returns:
+        int: Number of rows loaded, 0 if nothing was flushed.
+    """
+    lock_path = _table_dir(table_name) / ".flush.lock"
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        spool_stats = stats(table_name)
+        if spool_stats.segments == 0:
+            logger.info("Spool for %s is empty; nothing to flush.", table_name)
+            return 0
+        if spool_stats.records < min_records and spool_stats.lag_seconds < max_lag_seconds:
+            logger.info(
+                "Deferring flush of %s: %d records pending, lag %.0fs",
+                table_name, spool_stats.records, spool_stats.lag_seconds,
+            )
+            return 0
+
+        segments = pending_segments(table_name)
+        batch = [(path.stem, read_segment(path)) for path in segments]
+        loaded = load(batch)
+
+        for path in segments:
+            path.unlink(missing_ok=True)
+
+        logger.info("Flushed %d segments (%d rows) into %s", len(segments), loaded, table_name)
+        return loaded
@@ -0,0 +1,108 @@
+"""Tests for the backpressure gate used by high-frequency DAGs."""
+import copy
+
+import pendulum
+import pytest
+
+from include.utils import backpressure
+
+DAG_ID = "iss_location_api_dag"
+PERIOD = pendulum.duration(minutes=1)
+START = pendulum.datetime(2024, 1, 1, tz="UTC")
+
+
+class FakeVariable:
+    """In-memory stand-in for airflow.models.Variable."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key, default_var=None, deserialize_json=False):
+        return copy.deepcopy(self.store.get(key, default_var))
+
+    def set(self, key, value, serialize_json=False):
+        self.store[key] = copy.deepcopy(value)
+
+
+class FakeStats:
+    @staticmethod
+    def incr(*args, **kwargs):
+        pass
+
+    @staticmethod
+    def timing(*args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [START]
+    monkeypatch.setattr(backpressure, "Variable", FakeVariable())
+    monkeypatch.setattr(backpressure, "Stats", FakeStats)
+    monkeypatch.setattr(backpressure.pendulum, "now", lambda tz=None: now[0])
+    return now
+
+
+def simulate(clock, run_seconds: float, runs: int = 30) -> list[int]:
+    """
+    Replay a `*/1` schedule with max_active_runs=1 and catchup disabled.
+
+    Each run is created for the latest interval that has ended once the
+    previous run finished, and a full run takes `run_seconds`.
+    """
+    decisions = []
+    interval_end = START + PERIOD
+    finished = START
+    for _ in range(runs):
+        latest_end = finished.start_of("minute")
+        interval_end = max(interval_end + PERIOD, latest_end)
+        started = max(interval_end, finished)
+        clock[0] = started
+        proceed = backpressure.should_run(DAG_ID, interval_end - PERIOD, interval_end)
+        decisions.append(int(proceed))
+        if proceed:
+            clock[0] = started + pendulum.duration(seconds=run_seconds)
+            backpressure.record_latency(DAG_ID, started)
+        finished = clock[0]
+    return decisions
+
+
+def skips(reason: str) -> int:
+    state = backpressure.Variable.get(backpressure._state_key(DAG_ID), default_var={})
+    return state.get("skip_counts", {}).get(reason, 0)
+
+
+@pytest.mark.parametrize("run_seconds", [20, 35, 45, 59])
+def test_runs_that_keep_up_are_never_coalesced(clock, run_seconds):
+    assert all(simulate(clock, run_seconds))
+    assert skips("coalesced") == 0
+    assert skips("dropped") == 0
+
+
+def test_runs_that_overrun_the_schedule_are_coalesced(clock):
+    decisions = simulate(clock, run_seconds=100)
+    assert 0 in decisions[1:]
+    assert 1 in decisions[1:]
+    assert skips("coalesced") > 0
+
+
+def test_intervals_the_scheduler_skips_are_recorded(clock):
+    # A 150s run means the scheduler never creates the intervals it overlaps.
+    clock[0] = START + PERIOD
+    assert backpressure.should_run(DAG_ID, START, START + PERIOD)
+    gap_start = START + 3 * PERIOD
+    clock[0] = gap_start + PERIOD
+    assert backpressure.should_run(DAG_ID, gap_start, gap_start + PERIOD)
+
+    state = backpressure.Variable.get(backpressure._state_key(DAG_ID), default_var={})
+    assert state["skipped_intervals"] == [{
+        "reason": "coalesced",
+        "interval_start": (START + PERIOD).isoformat(),
+        "interval_end": gap_start.isoformat(),
+    }]
+
+
+def test_manual_runs_always_proceed(clock):
+    simulate(clock, run_seconds=100, runs=5)
+    stale_end = START - pendulum.duration(hours=1)
+    assert backpressure.should_run(DAG_ID, stale_end - PERIOD, stale_end, is_manual=True)
@@ -0,0 +1,212 @@
+"""
+Concurrent-session load test for streamlit_app.py.
+
+Runs N headless sessions of the dashboard in one process with Streamlit's
+AppTest, the same way the Streamlit server shares caches and the Snowflake
+connection across sessions. Snowflake is replaced by a stub connector that
+returns canned results after a configurable query latency. Each session
+reruns the script on the autorefresh interval, and the harness reports rerun
+latency percentiles, queries per minute, and process CPU and memory per session.
+
+Usage:
+    python benchmarks/dashboard_load_test.py --sessions 30 --duration 120 \\
+        --refresh-interval 10 --query-latency 0.25 [--show-all]
+"""
+import argparse
+import resource
+import statistics
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pandas as pd
+from streamlit import logger as streamlit_logger
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "streamlit_app.py"
+
+ASTRONAUT_COUNT = 700
+
+
+def _canned_results() -> dict[str, pd.DataFrame]:
+    astronauts = pd.DataFrame({
+        "ASTRONAUT_ID": range(ASTRONAUT_COUNT),
+        "NAME": [f"Astronaut {i}" for i in range(ASTRONAUT_COUNT)],
+        "STATUS": "Active",
+        "AGENCY": "National Aeronautics and Space Administration",
+        "NATIONALITY": "American",
+        "IS_IN_SPACE": [i % 70 == 0 for i in range(ASTRONAUT_COUNT)],
+        "CURRENT_CRAFT": ["ISS" if i % 70 == 0 else None for i in range(ASTRONAUT_COUNT)],
+        "AGE": 50,
+        "BIO": "Lorem ipsum dolor sit amet. " * 40,
+        "PROFILE_IMAGE": "https://example.org/profile.jpg",
+        "WIKIPEDIA_URL": "https://en.wikipedia.org/wiki/Astronaut",
+        "LOAD_TS": pd.Timestamp("2024-01-01"),
+    })
+    apod = pd.DataFrame([{
+        "COPYRIGHT": None,
+        "APOD_DATE": pd.Timestamp("2024-01-01"),
+        "EXPLANATION": "Lorem ipsum dolor sit amet. " * 20,
+        "HD_URL": "https://example.org/apod_hd.jpg",
+        "MEDIA_TYPE": "image",
+        "TITLE": "A Picture of the Day",
+        "URL": "https://example.org/apod.jpg",
+        "IMAGE_URL": "https://example.org/apod.jpg",
+        "LOAD_TS": pd.Timestamp("2024-01-01"),
+    }])
+    iss = pd.DataFrame([{
+        "LATITUDE": 12.3,
+        "LONGITUDE": 45.6,
+        "RETRIEVED_AT": pd.Timestamp("2024-01-01 12:00:00"),
+        "DISTANCE_TRAVELED_KM": 460.0,
+        "SPEED_KPH": 27600.0,
+    }])
+    return {"MC_ASTRONAUTS": astronauts, "MC_APOD_CURRENT": apod, "MC_ISS_CURRENT": iss}
+
+
+class StubSnowflake:
+    """Stand-in for snowflake.connector that sleeps for a fixed latency per query."""
+
+    def __init__(self, query_latency: float):
+        self.query_latency = query_latency
+        self.results = _canned_results()
+        self.query_times: list[float] = []
+        self._lock = threading.Lock()
+
+    def connect(self, **kwargs) -> "StubConnection":
+        return StubConnection(self)
+
+    def module(self) -> types.ModuleType:
+        connector = types.ModuleType("snowflake.connector")
+        connector.connect = self.connect
+        package = types.ModuleType("snowflake")
+        package.connector = connector
+        return package
+
+
+class StubConnection:
+    def __init__(self, stub: StubSnowflake):
+        self.stub = stub
+
+    def cursor(self) -> "StubCursor":
+        return StubCursor(self.stub)
+
+
+class StubCursor:
+    def __init__(self, stub: StubSnowflake):
+        self.stub = stub
+        self.result = pd.DataFrame()
+
+    def __enter__(self) -> "StubCursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def execute(self, query: str) -> None:
+        time.sleep(self.stub.query_latency)
+        with self.stub._lock:
+            self.stub.query_times.append(time.monotonic())
+        table = next((name for name in self.stub.results if name in query.upper()), None)
+        self.result = self.stub.results[table].copy() if table else pd.DataFrame()
+
+    def fetch_pandas_all(self) -> pd.DataFrame:
+        return self.result
+
+
+def run_session(
+    session_id: int,
+    duration: float,
+    refresh_interval: float,
+    show_all: bool,
+    latencies: list[float],
+    errors: list[str],
+    lock: threading.Lock,
+) -> None:
+    app = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    app.secrets["snowflake"] = {"account": "stub", "user": "stub", "password": "stub"}
+
+    deadline = time.monotonic() + duration
+    # Stagger session start so reruns are spread over the refresh interval like real users.
+    time.sleep(refresh_interval * (session_id % 10) / 10)
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        app.run()
+        elapsed = time.monotonic() - started
+        if show_all and app.toggle and not app.toggle[0].value:
+            app.toggle[0].set_value(True)
+        with lock:
+            latencies.append(elapsed)
+            errors.extend(str(exception.value) for exception in app.exception)
+        time.sleep(max(0.0, refresh_interval - elapsed))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="Number of concurrent sessions")
+    parser.add_argument("--duration", type=float, default=120.0, help="Test duration in seconds")
+    parser.add_argument("--refresh-interval", type=float, default=60.0, help="Seconds between reruns per session")
+    parser.add_argument("--query-latency", type=float, default=0.2, help="Stub Snowflake latency per query in seconds")
+    parser.add_argument("--show-all", action="store_true", help="Switch sessions to the paginated all-astronauts grid")
+    args = parser.parse_args()
+
+    streamlit_logger.set_log_level("error")
+
+    stub = StubSnowflake(args.query_latency)
+    package = stub.module()
+    sys.modules["snowflake"] = package
+    sys.modules["snowflake.connector"] = package.connector
+
+    latencies: list[float] = []
+    errors: list[str] = []
+    lock = threading.Lock()
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cpu_before = time.process_time()
+    started = time.monotonic()
+
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(i, args.duration, args.refresh_interval, args.show_all, latencies, errors, lock),
+            daemon=True,
+        )
+        for i in range(args.sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall = time.monotonic() - started
+    cpu = time.process_time() - cpu_before
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS.
+    rss_scale = 1 if sys.platform == "darwin" else 1024
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_delta_mib = (rss_peak - rss_before) * rss_scale / 2**20
+
+    print(f"sessions={args.sessions} duration={wall:.0f}s refresh={args.refresh_interval}s "
+          f"query_latency={args.query_latency}s show_all={args.show_all}")
+    if latencies:
+        print(f"reruns:           {len(latencies)}")
+        print(f"rerun latency:    p50={percentile(latencies, 50):.3f}s p90={percentile(latencies, 90):.3f}s "
+              f"p99={percentile(latencies, 99):.3f}s max={max(latencies):.3f}s mean={statistics.mean(latencies):.3f}s")
+    print(f"queries:          {len(stub.query_times)} total, {len(stub.query_times) / wall * 60:.1f}/min")
+    print(f"cpu:              {cpu:.1f}s total, {cpu / wall * 100:.0f}% of one core, "
+          f"{cpu / args.sessions:.2f}s per session")
+    print(f"memory:           peak RSS {rss_peak * rss_scale / 2**20:.0f} MiB, "
+          f"+{rss_delta_mib:.0f} MiB during test, {rss_delta_mib / args.sessions:.1f} MiB per session")
+    if errors:
+        print(f"errors:           {len(errors)} (first: {errors[0]})")
+
+
+if __name__ == "__main__":
+    main()
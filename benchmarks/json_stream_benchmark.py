@@ -0,0 +1,188 @@
+"""
+Benchmark full JSON parsing against parsing with field projection.
+
+Compares parse time and peak Python memory of the previous approach
+(`response.json()` and keeping every full astronaut object) with the two
+paths of `read_projected` using `AstronautsStrategy.fields`: `json.loads`
+followed by projection (small responses) and `parse_projected` streaming
+(large responses), on a set of SpaceDevs astronaut pages.
+
+Usage:
+    python benchmarks/json_stream_benchmark.py [recorded_page.json ...]
+
+Recorded pages can be captured with
+`curl "https://ll.thespacedevs.com/2.2.0/astronaut/?limit=100" > page.json`
+(the normal mode the DAG uses) or with `&mode=detailed` appended.
+When no pages are given, synthetic pages shaped like normal and detailed
+SpaceDevs astronaut responses are generated and benchmarked separately.
+"""
+import io
+import json
+import random
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "astro"))
+
+from include.get_astronauts import AstronautsStrategy  # noqa: E402
+from include.utils.json_stream import parse_projected  # noqa: E402
+
+ASTRONAUT_FIELDS = AstronautsStrategy.fields
+
+SYNTHETIC_PAGES = 8
+RECORDS_PER_PAGE = 100
+REPEATS = 3
+
+
+def _text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(string.ascii_letters + " ") for _ in range(length))
+
+
+def _agency(rng: random.Random) -> dict:
+    return {
+        "id": rng.randint(1, 500),
+        "url": "https://ll.thespacedevs.com/2.2.0/agencies/44/",
+        "name": _text(rng, 30),
+        "type": "Government",
+        "country_code": "USA",
+        "description": _text(rng, 1500),
+        "administrator": _text(rng, 30),
+        "launchers": _text(rng, 60),
+        "spacecraft": _text(rng, 60),
+        "logo_url": "https://example.org/logo.png",
+    }
+
+
+def _flight(rng: random.Random) -> dict:
+    return {
+        "id": _text(rng, 36),
+        "url": "https://ll.thespacedevs.com/2.2.0/launch/abc/",
+        "name": _text(rng, 40),
+        "status": {"id": 3, "name": "Launch Successful", "description": _text(rng, 200)},
+        "net": "2021-04-23T09:49:02Z",
+        "launch_service_provider": _agency(rng),
+        "rocket": {"id": 1, "configuration": {"name": "Falcon 9", "family": "Falcon", "variant": "Block 5"}},
+        "mission": {"id": 1, "name": _text(rng, 30), "description": _text(rng, 800), "orbit": {"name": "LEO"}},
+        "pad": {"id": 1, "name": _text(rng, 30), "location": {"name": _text(rng, 40)}},
+        "image": "https://example.org/launch.png",
+    }
+
+
+def synthetic_pages(detailed: bool, seed: int = 42) -> list[bytes]:
+    rng = random.Random(seed)
+    pages = []
+    for page in range(SYNTHETIC_PAGES):
+        results = []
+        for i in range(RECORDS_PER_PAGE):
+            astronaut = {
+                "id": page * RECORDS_PER_PAGE + i,
+                "url": "https://ll.thespacedevs.com/2.2.0/astronaut/1/",
+                "name": _text(rng, 20),
+                "status": {"id": 1, "name": "Active"},
+                "type": {"id": 2, "name": "Government"},
+                "in_space": rng.random() < 0.02,
+                "time_in_space": "P200DT4H",
+                "eva_time": "PT12H",
+                "age": rng.randint(30, 90),
+                "date_of_birth": "1970-01-01",
+                "date_of_death": None,
+                "nationality": "American",
+                "bio": _text(rng, 1200),
+                "twitter": None,
+                "instagram": None,
+                "wiki": "https://en.wikipedia.org/wiki/Astronaut",
+                "agency": {
+                    "id": rng.randint(1, 500),
+                    "url": "https://ll.thespacedevs.com/2.2.0/agencies/44/",
+                    "name": _text(rng, 30),
+                    "type": "Government",
+                },
+                "profile_image": "https://example.org/profile.jpg",
+                "profile_image_thumbnail": "https://example.org/thumb.jpg",
+                "flights_count": 3,
+                "landings_count": 3,
+                "spacewalks_count": 2,
+                "last_flight": "2021-04-23T09:49:02Z",
+                "first_flight": "2008-11-15T00:55:39Z",
+            }
+            if detailed:
+                astronaut["agency"] = _agency(rng)
+                astronaut["flights"] = [_flight(rng) for _ in range(rng.randint(1, 6))]
+                astronaut["landings"] = [_flight(rng) for _ in range(rng.randint(1, 3))]
+                astronaut["spacewalks"] = [
+                    {"id": j, "name": _text(rng, 30), "duration": "PT6H"} for j in range(4)
+                ]
+            results.append(astronaut)
+        nxt = f"https://ll.thespacedevs.com/2.2.0/astronaut/?limit=100&offset={(page + 1) * 100}"
+        pages.append(json.dumps({"count": SYNTHETIC_PAGES * RECORDS_PER_PAGE, "next": nxt, "results": results}).encode())
+    return pages
+
+
+def full_parse(pages: list[bytes]) -> list[dict]:
+    records = []
+    for page in pages:
+        data = json.loads(page.decode("utf-8"))
+        records.extend(data.get("results", []))
+        data.get("next")
+    return records
+
+
+def loaded_projection(pages: list[bytes]) -> list[dict]:
+    wanted = set(ASTRONAUT_FIELDS)
+    records = []
+    for page in pages:
+        data = json.loads(page.decode("utf-8"))
+        records.extend({key: value for key, value in item.items() if key in wanted} for item in data.get("results", []))
+        data.get("next")
+    return records
+
+
+def projected_parse(pages: list[bytes]) -> list[dict]:
+    records = []
+    for page in pages:
+        results, _ = parse_projected(io.BytesIO(page), "results", fields=ASTRONAUT_FIELDS, meta_keys=("next",))
+        records.extend(results)
+    return records
+
+
+def measure(func, pages: list[bytes]) -> tuple[float, float, int]:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(pages)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    records = func(pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20, len(records)
+
+
+def report(source: str, pages: list[bytes]) -> None:
+    print(f"{source}, {sum(len(page) for page in pages) / 2**20:.1f} MiB of JSON")
+    print(f"{'approach':<22}{'records':>9}{'best time (s)':>16}{'peak mem (MiB)':>17}")
+    approaches = (
+        ("json + extend", full_parse),
+        ("json + projection", loaded_projection),
+        ("streamed projection", projected_parse),
+    )
+    for name, func in approaches:
+        seconds, peak, count = measure(func, pages)
+        print(f"{name:<22}{count:>9}{seconds:>16.3f}{peak:>17.1f}")
+
+
+def main(paths: list[str]) -> None:
+    if paths:
+        report(f"{len(paths)} recorded pages", [Path(path).read_bytes() for path in paths])
+        return
+    report(f"{SYNTHETIC_PAGES} synthetic normal-mode pages", synthetic_pages(detailed=False))
+    print()
+    report(f"{SYNTHETIC_PAGES} synthetic detailed-mode pages", synthetic_pages(detailed=True))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
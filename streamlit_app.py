@@ -1,3 +1,9 @@
+import functools
+import logging
+import os
+import time
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import snowflake.connector
@@ -14,6 +20,44 @@ st.set_page_config(
 
 st_autorefresh(interval=60 * 1000, key="data_refresh")
 
+# --- Profiling ---
+# Set SPACE_CADET_PROFILE=1 to sample-profile the data loaders with pyinstrument.
+# Flamegraphs are written to PROFILE_OUTPUT_DIR as speedscope JSON.
+PROFILE_ENABLED = os.environ.get("SPACE_CADET_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_OUTPUT_DIR = Path(os.environ.get("PROFILE_OUTPUT_DIR", "/tmp/space_cadet_profiles")) / "streamlit"
+
+logger = logging.getLogger(__name__)
+
+def profiled(func):
+    if not PROFILE_ENABLED:
+        return func
+
+    try:
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+    except ImportError:
+        logger.warning("Profiling requested but pyinstrument is not installed; running unprofiled.")
+        return func
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = Profiler(interval=0.001)
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+            ctx = get_script_run_ctx()
+            run_id = f"{ctx.session_id if ctx else 'no-session'}_{time.strftime('%Y%m%dT%H%M%S')}"
+            path = PROFILE_OUTPUT_DIR / run_id / f"{func.__name__}.speedscope.json"
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(profiler.output(renderer=SpeedscopeRenderer()))
+            except OSError as e:
+                logger.error("Could not save profile to %s: %s", path, e)
+    return wrapper
+
 # --- Snowflake Connection ---
 @st.cache_resource
 def get_snowflake_conn():
@@ -31,6 +75,7 @@ def run_query(query: str) -> pd.DataFrame:
         cur.execute(query)
         return cur.fetch_pandas_all()
 
+@profiled
 def get_iss_latest_location():
     query = """
     SELECT 
@@ -40,26 +85,20 @@ def get_iss_latest_location():
         DISTANCE_TRAVELED_KM,
         SPEED_KPH
     FROM 
-        SPACE_CADET_DB.MISSION_CONTROL.MC_ISS_LOCATION
-    WHERE 
-        RETRIEVED_AT IS NOT NULL
-    ORDER BY 
-        RETRIEVED_AT DESC
-    LIMIT 1
+        SPACE_CADET_DB.MISSION_CONTROL.MC_ISS_CURRENT
     """
     return run_query(query)
 
 @st.cache_data(ttl=3600)
+@profiled
 def get_astronauts_data():
     query = "SELECT * FROM SPACE_CADET_DB.MISSION_CONTROL.MC_ASTRONAUTS"
     return run_query(query)
 
 @st.cache_data(ttl=600)
+@profiled
 def get_apod_data():
-    query = """
-    SELECT * FROM SPACE_CADET_DB.MISSION_CONTROL.MC_APOD
-    WHERE APOD_DATE = (SELECT MAX(APOD_DATE) FROM SPACE_CADET_DB.MISSION_CONTROL.MC_APOD)
-    """
+    query = "SELECT * FROM SPACE_CADET_DB.MISSION_CONTROL.MC_APOD_CURRENT"
     return run_query(query)
 
 # --- Main App ---